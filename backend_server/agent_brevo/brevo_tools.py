@@ -3,12 +3,19 @@ Brevo API Tools for contact management and email operations
 """
 
 import requests
+from http.cookiejar import DefaultCookiePolicy
 import json
 from typing import Dict, List, Optional, Any 
 
 # Base URL for Brevo API
 BREVO_BASE_URL = "https://api.brevo.com/v3"
 
+# Shared HTTP session so Brevo API calls reuse pooled keep-alive connections.
+# Cookies are never stored, so one user's call can't leak them into another's
+_http_session = requests.Session()
+_http_session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+_http_session.mount('https://', requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=64))
+
 def get_headers(api_key: str) -> Dict[str, str]:
     """Get standard headers for Brevo API requests"""
     return {
@@ -64,7 +71,7 @@ def create_contact(
         contact_data["listIds"] = list_ids
     
     try:
-        response = requests.post(
+        response = _http_session.post(
             url,
             headers=get_headers(api_key),
             json=contact_data
@@ -104,7 +111,7 @@ def get_contact(api_key: str, identifier: str) -> Dict[str, Any]:
     url = f"{BREVO_BASE_URL}/contacts/{requests.utils.quote(identifier, safe='')}"
     
     try:
-        response = requests.get(url, headers=get_headers(api_key))
+        response = _http_session.get(url, headers=get_headers(api_key))
         
         if response.status_code == 200:
             return {
@@ -164,7 +171,7 @@ def get_all_contacts(
         params["listIds"] = ",".join(map(str, list_ids))
     
     try:
-        response = requests.get(url, headers=get_headers(api_key), params=params)
+        response = _http_session.get(url, headers=get_headers(api_key), params=params)
         
         if response.status_code == 200:
             data = response.json()
@@ -247,7 +254,7 @@ def update_contact(
         update_data["unlinkListIds"] = unlink_list_ids
     
     try:
-        response = requests.put(
+        response = _http_session.put(
             url,
             headers=get_headers(api_key),
             json=update_data
@@ -286,7 +293,7 @@ def delete_contact(api_key: str, identifier: str) -> Dict[str, Any]:
     url = f"{BREVO_BASE_URL}/contacts/{requests.utils.quote(identifier, safe='')}"
     
     try:
-        response = requests.delete(url, headers=get_headers(api_key))
+        response = _http_session.delete(url, headers=get_headers(api_key))
         
         if response.status_code == 204:
             return {
@@ -356,7 +363,7 @@ def create_bulk_contacts(
         import_data["listIds"] = list_ids
     
     try:
-        response = requests.post(
+        response = _http_session.post(
             url,
             headers=get_headers(api_key),
             json=import_data
@@ -444,7 +451,7 @@ def send_transactional_email(
         email_data["params"] = params
     
     try:
-        response = requests.post(
+        response = _http_session.post(
             url,
             headers=get_headers(api_key),
             json=email_data
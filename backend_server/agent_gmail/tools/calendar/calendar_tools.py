@@ -5,6 +5,7 @@ Google Calendar Tools for event management and calendar operations
 import json
 import time
 import requests
+from http.cookiejar import DefaultCookiePolicy
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Union, Any
 from loguru import logger
@@ -15,6 +16,12 @@ CALENDAR_API_BASE = 'https://www.googleapis.com/calendar/v3'
 # Import token management from Gmail tools
 from ..gmail.gmail_reader_tool import get_active_tokens
 
+# Shared HTTP session so Calendar API calls reuse pooled keep-alive connections.
+# Cookies are never stored, so one user's call can't leak them into another's
+_http_session = requests.Session()
+_http_session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+_http_session.mount('https://', requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=64))
+
 
 def _make_calendar_request(endpoint: str, method: str = 'GET', params: Dict = None, data: Dict = None) -> Dict[str, Any]:
     """
@@ -42,13 +49,13 @@ def _make_calendar_request(endpoint: str, method: str = 'GET', params: Dict = No
     
     try:
         if method.upper() == 'GET':
-            response = requests.get(url, headers=headers, params=params or {})
+            response = _http_session.get(url, headers=headers, params=params or {})
         elif method.upper() == 'POST':
-            response = requests.post(url, headers=headers, params=params or {}, json=data)
+            response = _http_session.post(url, headers=headers, params=params or {}, json=data)
         elif method.upper() == 'PUT':
-            response = requests.put(url, headers=headers, params=params or {}, json=data)
+            response = _http_session.put(url, headers=headers, params=params or {}, json=data)
         elif method.upper() == 'DELETE':
-            response = requests.delete(url, headers=headers, params=params or {})
+            response = _http_session.delete(url, headers=headers, params=params or {})
         else:
             raise ValueError(f"Unsupported HTTP method: {method}")
             
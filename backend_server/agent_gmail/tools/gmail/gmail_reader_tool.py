@@ -6,6 +6,7 @@ Allows reading and listing emails from Gmail accounts using OAuth tokens
 import json
 import time
 import requests
+from http.cookiejar import DefaultCookiePolicy
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Union, Any
 from loguru import logger 
@@ -20,6 +21,12 @@ SCOPES = [
     'https://www.googleapis.com/auth/userinfo.email'
 ]
 
+# Shared HTTP session so Google API calls reuse pooled keep-alive connections.
+# Cookies are never stored, so one user's call can't leak them into another's
+_http_session = requests.Session()
+_http_session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+_http_session.mount('https://', requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=64))
+
 # Dynamic token storage (updated from frontend)
 _dynamic_tokens = {
     "access_token": None,
@@ -135,7 +142,7 @@ def _make_gmail_request(endpoint: str, params: Dict = None) -> Dict[str, Any]:
     url = f"{GMAIL_API_BASE}/{endpoint}"
     
     try:
-        response = requests.get(url, headers=headers, params=params or {})
+        response = _http_session.get(url, headers=headers, params=params or {})
         response.raise_for_status()
         return response.json()
         
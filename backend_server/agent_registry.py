@@ -4,6 +4,7 @@ Agent Registry - Centralized agent management
 
 from typing import Dict, Any
 import importlib
+from loguru import logger
 from config import AGENT_REGISTRY_CONFIG
 
 class AgentRegistry:
@@ -21,9 +22,9 @@ class AgentRegistry:
                 module = importlib.import_module(module_path)
                 agent = getattr(module, 'root_agent')
                 self._agents[agent_id] = agent
-                print(f"✅ Loaded agent: {agent_id}")
+                logger.info("✅ Loaded agent: {}", agent_id)
             except Exception as e:
-                print(f"❌ Failed to load agent {agent_id}: {e}")
+                logger.error("❌ Failed to load agent {}: {}", agent_id, e)
     
     def get_agent(self, agent_id: str) -> Any:
         """Get agent by ID"""
@@ -40,13 +41,13 @@ class AgentRegistry:
     def register_agent(self, agent_id: str, agent: Any):
         """Register a new agent"""
         self._agents[agent_id] = agent
-        print(f"✅ Registered agent: {agent_id}")
+        logger.info("✅ Registered agent: {}", agent_id)
     
     def unregister_agent(self, agent_id: str):
         """Unregister an agent"""
         if agent_id in self._agents:
             del self._agents[agent_id]
-            print(f"🗑️ Unregistered agent: {agent_id}")
+            logger.info("🗑️ Unregistered agent: {}", agent_id)
     
     def reload_agent(self, agent_id: str):
         """Reload a specific agent"""
@@ -57,9 +58,9 @@ class AgentRegistry:
                 module = importlib.reload(importlib.import_module(module_path))
                 agent = getattr(module, 'root_agent')
                 self._agents[agent_id] = agent
-                print(f"🔄 Reloaded agent: {agent_id}")
+                logger.info("🔄 Reloaded agent: {}", agent_id)
             except Exception as e:
-                print(f"❌ Failed to reload agent {agent_id}: {e}")
+                logger.error("❌ Failed to reload agent {}: {}", agent_id, e)
     
     def get_agent_info(self) -> Dict[str, Dict[str, Any]]:
         """Get information about all agents"""
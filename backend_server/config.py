@@ -2,6 +2,7 @@
 Configuration settings for the Agent API Server
 """
 
+import os
 from datetime import timedelta
 from typing import Dict, Any
 
@@ -12,6 +13,7 @@ CORS_ORIGINS = ["http://localhost:3000"]  # Next.js default port
 
 # Session Configuration
 SESSION_TIMEOUT = timedelta(hours=2)  # Sessions expire after 2 hours
+SESSION_CLEANUP_INTERVAL_SECONDS = SESSION_TIMEOUT.total_seconds() / 4  # Background expiry sweep period
 DEFAULT_APP_NAME = "adk_app"
 DEFAULT_USER_ID = "default_user"
 
@@ -28,10 +30,17 @@ AGENT_REGISTRY_CONFIG = {
 STREAMING_CONFIG = {
     "update_interval_ms": 8,  # 120fps for smoother streaming
     "batch_size": 1,          # Send each chunk immediately
+    "flush_threshold_chars": 1024,  # Coalesced content size that forces an SSE flush
 }
 
 # Memory Configuration
 MEMORY_THRESHOLD_EVENTS = 2  # Minimum events to add session to memory
+MEMORY_ADMISSION_THRESHOLD = 3.0  # Minimum log(message_count + 1) * log(text_chars + 1) score to add session to memory
+MEMORY_SEARCH_CACHE_SIZE = 256  # Cached (query, user_id, app_name) search results
+MEMORY_SEARCH_CACHE_TTL_SECONDS = 60  # Max age of a cached search result
+
+# Logging Configuration
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()  # Set LOG_LEVEL=DEBUG to see debug traces
 
 # API Configuration
 API_PREFIX = "/api/v1"
@@ -2,26 +2,60 @@
 Controllers for handling business logic
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, List, Mapping
 from fastapi import HTTPException
-from models import *
+from fastapi.responses import ORJSONResponse, Response
+from models import (
+    AgentRequest, AgentResponse, AgentListResponse, AgentDetailResponse, ToolInfo,
+    SessionEndResponse,
+    MemorySearchRequest, MemorySearchResponse, MemoryResult,
+    GmailTokenRequest, GmailTokenResponse,
+    HealthResponse, StreamingStatsResponse
+)
 from memory_handler import MemoryHandler
 from streaming_handler import StreamingHandler
 from agent_gmail.tools.gmail.gmail_reader_tool import update_gmail_tokens
 import uuid
+from loguru import logger
 from datetime import datetime
 
+# Health response template; only the timestamp changes per request
+_HEALTH_TEMPLATE = HealthResponse(
+    message="Agent API Server is running",
+    status="healthy",
+    timestamp=""
+)
+
+# Static Gmail status payload, shared across requests until a real check exists
+_GMAIL_STATUS_NOT_IMPLEMENTED: Dict[str, Any] = {
+    "authenticated": False,
+    "user_email": None,
+    "message": "Gmail status check not implemented"
+}
+
 class AgentController:
     """Controller for agent-related operations"""
     
-    def __init__(self, agent_registry: Dict[str, Any], streaming_handler: StreamingHandler, memory_handler: MemoryHandler):
+    def __init__(self, agent_registry: Mapping[str, Any], streaming_handler: StreamingHandler, memory_handler: MemoryHandler):
         self.agent_registry = agent_registry
+        # Fixed agent ids for the 404 membership checks
+        self._agent_keys = frozenset(agent_registry)
         self.streaming_handler = streaming_handler
         self.memory_handler = memory_handler
+        # Prebuilt per-agent responses; call_agent_sync only fills in the text
+        self._response_templates = {
+            agent_id: AgentResponse(response="", agent_id=agent_id, status="success")
+            for agent_id in agent_registry
+        }
+        # The registry is fixed after startup, so agent listings and details
+        # are serialized once and served as raw JSON bytes afterwards
+        agent_list = AgentListResponse(agents=list(agent_registry.keys()), count=len(agent_registry))
+        self._agent_list_json = AgentListResponse.__pydantic_serializer__.to_json(agent_list)
+        self._agent_details_json: Dict[str, bytes] = {}
 
     async def call_agent_sync(self, agent_id: str, request: AgentRequest) -> AgentResponse:
         """Call agent synchronously and return complete response"""
-        if agent_id not in self.agent_registry:
+        if agent_id not in self._agent_keys:
             raise HTTPException(
                 status_code=404, 
                 detail=f"Agent '{agent_id}' not found. Available agents: {list(self.agent_registry.keys())}"
@@ -41,15 +75,14 @@ class AgentController:
                 agent_id=agent_id,
                 user_id=user_id,
                 agent=agent,
-                message=request.message
+                message=request.message,
+                with_metadata=False
             ):
                 if event.type.value == "content":
                     full_response += event.content
             
-            return AgentResponse(
-                response=full_response,
-                agent_id=agent_id,
-                status="success"
+            return self._response_templates[agent_id].model_copy(
+                update={"response": full_response}
             )
         
         except Exception as e:
@@ -60,7 +93,7 @@ class AgentController:
 
     async def stream_agent(self, agent_id: str, request: AgentRequest):
         """Stream agent response"""
-        if agent_id not in self.agent_registry:
+        if agent_id not in self._agent_keys:
             raise HTTPException(
                 status_code=404, 
                 detail=f"Agent '{agent_id}' not found. Available agents: {list(self.agent_registry.keys())}"
@@ -92,16 +125,22 @@ class AgentController:
                 detail=f"Error streaming agent '{agent_id}': {str(e)}"
             )
 
-    def list_agents(self) -> AgentListResponse:
+    def list_agents(self) -> Response:
         """List all available agents"""
-        return AgentListResponse(
-            agents=list(self.agent_registry.keys()),
-            count=len(self.agent_registry)
-        )
+        return Response(content=self._agent_list_json, media_type="application/json")
+
+    def get_agent_details_response(self, agent_id: str) -> Response:
+        """Get agent details as a JSON response, serialized once per agent"""
+        content = self._agent_details_json.get(agent_id)
+        if content is None:
+            details = self.get_agent_details(agent_id)
+            content = AgentDetailResponse.__pydantic_serializer__.to_json(details)
+            self._agent_details_json[agent_id] = content
+        return Response(content=content, media_type="application/json")
 
     def get_agent_details(self, agent_id: str) -> AgentDetailResponse:
         """Get detailed information about a specific agent"""
-        if agent_id not in self.agent_registry:
+        if agent_id not in self._agent_keys:
             raise HTTPException(
                 status_code=404,
                 detail=f"Agent '{agent_id}' not found. Available agents: {list(self.agent_registry.keys())}"
@@ -113,7 +152,7 @@ class AgentController:
         agent_name = getattr(agent, 'name', agent_id)
         agent_model = getattr(agent, 'model', 'unknown')
         agent_instruction = getattr(agent, 'instruction', '')
-        print("agent_instruction >> ", agent_instruction)
+        logger.debug("Agent {} instruction: {}", agent_id, agent_instruction)
         
         # Extract tools information
         tools = []
@@ -226,18 +265,12 @@ class SessionController:
     def __init__(self, memory_handler: MemoryHandler):
         self.memory_handler = memory_handler
 
-    def get_user_sessions(self, user_id: str = "default_user") -> UserSessionsResponse:
-        """Get active sessions for a user"""
-        active_sessions_data = self.memory_handler.get_user_sessions(user_id)
-        active_sessions = {
-            agent_id: SessionInfo(**info) 
-            for agent_id, info in active_sessions_data.items()
-        }
-        
-        return UserSessionsResponse(
-            user_id=user_id,
-            active_sessions=active_sessions
-        )
+    def get_user_sessions(self, user_id: str = "default_user") -> ORJSONResponse:
+        """Get active sessions for a user, serialized in a single orjson pass"""
+        return ORJSONResponse({
+            "user_id": user_id,
+            "active_sessions": self.memory_handler.get_user_sessions(user_id)
+        })
 
     async def end_session(self, agent_id: str, user_id: str = "default_user") -> SessionEndResponse:
         """End a specific session and add to memory if meaningful"""
@@ -278,6 +311,26 @@ class MemoryController:
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
 
+    async def stream_search_memory(self, request: MemorySearchRequest):
+        """Search memory and stream matches as NDJSON"""
+        try:
+            results_data = await self.memory_handler.search_memory(
+                query=request.query,
+                user_id=request.user_id,
+                app_name=request.app_name
+            )
+            
+            # Validate and normalize like /memory/search before anything is
+            # sent, so bad results fail with a 500 instead of cutting the stream
+            results = [
+                MemoryResult(**result).model_dump(mode="json")
+                for result in results_data["results"]
+            ]
+            
+            return self.memory_handler.iter_memory_ndjson(request.query, results)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
 class GmailController:
     """Controller for Gmail-specific operations"""
     
@@ -295,7 +348,7 @@ class GmailController:
             return GmailTokenResponse(
                 success=True,
                 message="Gmail tokens updated successfully",
-                data=result if isinstance(result, dict) else {"status": "updated"}
+                data=result
             )
         except Exception as e:
             raise HTTPException(
@@ -306,20 +359,9 @@ class GmailController:
     @staticmethod
     async def get_gmail_status() -> Dict[str, Any]:
         """Get Gmail authentication status"""
-        try:
-            # This would need to be implemented in the Gmail tools
-            # For now, return a basic status
-            return {
-                "authenticated": False,
-                "user_email": None,
-                "message": "Gmail status check not implemented"
-            }
-        except Exception as e:
-            return {
-                "authenticated": False,
-                "user_email": None,
-                "error": str(e)
-            }
+        # This would need to be implemented in the Gmail tools
+        # For now, return a basic status
+        return _GMAIL_STATUS_NOT_IMPLEMENTED
 
 class SystemController:
     """Controller for system operations"""
@@ -330,11 +372,7 @@ class SystemController:
 
     def get_health(self) -> HealthResponse:
         """Get system health status"""
-        return HealthResponse(
-            message="Agent API Server is running",
-            status="healthy",
-            timestamp=datetime.now().isoformat()
-        )
+        return _HEALTH_TEMPLATE.model_copy(update={"timestamp": datetime.now().isoformat()})
 
     def get_streaming_stats(self) -> StreamingStatsResponse:
         """Get streaming statistics"""
@@ -2,11 +2,17 @@
 Main FastAPI Application - Modular Architecture
 """
 
+import asyncio
+import contextlib
+import sys
+from types import MappingProxyType
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from loguru import logger
 
 # Import configuration and services
-from config import SERVER_TITLE, SERVER_VERSION, CORS_ORIGINS, STREAMING_CONFIG
+from config import SERVER_TITLE, SERVER_VERSION, CORS_ORIGINS, STREAMING_CONFIG, SESSION_CLEANUP_INTERVAL_SECONDS, LOG_LEVEL
 from agent_registry import AgentRegistry
 from memory_handler import MemoryHandler
 from streaming_handler import StreamingHandler
@@ -20,8 +26,30 @@ from google.adk.memory import InMemoryMemoryService
 def create_app() -> FastAPI:
     """Create and configure the FastAPI application"""
     
+    # Route logs through a queue so sink writes never block the event loop
+    logger.remove()
+    logger.add(sys.stderr, level=LOG_LEVEL, enqueue=True)
+    
+    @contextlib.asynccontextmanager
+    async def lifespan(app: FastAPI):
+        # Sweep expired sessions in the background for the lifetime of the app
+        cleanup_task = asyncio.create_task(
+            memory_handler.run_cleanup_loop(SESSION_CLEANUP_INTERVAL_SECONDS)
+        )
+        try:
+            yield
+        finally:
+            cleanup_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await cleanup_task
+    
     # Initialize FastAPI app
-    app = FastAPI(title=SERVER_TITLE, version=SERVER_VERSION)
+    app = FastAPI(
+        title=SERVER_TITLE,
+        version=SERVER_VERSION,
+        default_response_class=ORJSONResponse,
+        lifespan=lifespan
+    )
     
     # Add CORS middleware
     app.add_middleware(
@@ -46,13 +74,11 @@ def create_app() -> FastAPI:
     
     # Initialize agent registry
     agent_registry = AgentRegistry()
+    agents = MappingProxyType(agent_registry.get_all_agents())
     
-    # Initialize controllers
-    agent_controller = AgentController(
-        agent_registry.get_all_agents(),
-        streaming_handler,
-        memory_handler
-    )
+    # Initialize controllers once at startup; their one-time setup (response
+    # templates, pre-serialized agent list) stays off the request path
+    agent_controller = AgentController(agents, streaming_handler, memory_handler)
     session_controller = SessionController(memory_handler)
     memory_controller = MemoryController(memory_handler)
     gmail_controller = GmailController()
@@ -76,4 +102,4 @@ app = create_app()
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run(app, host="0.0.0.0", port=8000, access_log=False)
@@ -76,18 +76,22 @@ app = create_app()
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run(app, host="0.0.0.0", port=8000, access_log=False)
 
 from fastapi import HTTPException
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple, Set
+from collections import defaultdict
+from dataclasses import dataclass
 import uuid
 import json
 from datetime import datetime, timedelta
 import sys
 import os
 import asyncio
+import time
+from loguru import logger
 
 from agent_web.agent import root_agent as academic_coordinator
 from agent_web_searcher.agent import root_agent as expert_web_searcher
@@ -106,9 +110,25 @@ AGENT_REGISTRY = {
     "story_expert": story_expert,
 }
 
+@dataclass
+class SessionRec:
+    """Tracked session for a user-agent combination"""
+    session_id: str
+    session: Any
+    created_at: float  # time.monotonic()
+    expiry: float  # time.monotonic() deadline
+    last_activity: float  # time.monotonic()
+    message_count: int = 0
+
 # Session management
-USER_SESSIONS: Dict[str, Dict[str, Any]] = {}  # user_id -> {agent_id -> session_info}
+USER_SESSIONS: Dict[Tuple[str, str], SessionRec] = {}  # (user_id, agent_id) -> session_info
+USER_INDEX: Dict[str, Set[str]] = defaultdict(set)  # user_id -> {agent_id}
 SESSION_TIMEOUT = timedelta(hours=2)  # Sessions expire after 2 hours
+SESSION_TIMEOUT_SECONDS = SESSION_TIMEOUT.total_seconds()
+
+def _monotonic_to_datetime(monotonic_ts: float) -> datetime:
+    """Convert a time.monotonic() reading to a wall-clock datetime for display"""
+    return datetime.fromtimestamp(time.time() - (time.monotonic() - monotonic_ts))
 
 class AgentRequest(BaseModel):
     message: str
@@ -128,23 +148,20 @@ class GmailTokenRequest(BaseModel):
 # Session management functions
 async def get_or_create_session(user_id: str, agent_id: str, app_name: str = "adk_app"):
     """Get existing session or create new one for user-agent combination"""
-    current_time = datetime.now()
-    
-    # Initialize user sessions if not exists
-    if user_id not in USER_SESSIONS:
-        USER_SESSIONS[user_id] = {}
+    now = time.monotonic()
     
     # Check if session exists and is not expired
-    if agent_id in USER_SESSIONS[user_id]:
-        session_info = USER_SESSIONS[user_id][agent_id]
-        if current_time - session_info['created_at'] < SESSION_TIMEOUT:
+    session_info = USER_SESSIONS.get((user_id, agent_id))
+    if session_info is not None:
+        if now < session_info.expiry:
             # Session is still valid, return existing session
-            return session_info['session_id'], session_info['session']
+            return session_info.session_id, session_info.session
         else:
             # Session expired, clean it up
             await cleanup_expired_session(user_id, agent_id, session_info)
     
     # Create new session
+    current_time = datetime.now()
     session_id = f"{user_id}_{agent_id}_{int(current_time.timestamp())}"
     session = await session_service.create_session(
         app_name=app_name,
@@ -158,50 +175,56 @@ async def get_or_create_session(user_id: str, agent_id: str, app_name: str = "ad
     )
     
     # Store session info
-    USER_SESSIONS[user_id][agent_id] = {
-        'session_id': session_id,
-        'session': session,
-        'created_at': current_time,
-        'last_activity': current_time,
-        'message_count': 0
-    }
+    USER_SESSIONS[(user_id, agent_id)] = SessionRec(
+        session_id=session_id,
+        session=session,
+        created_at=now,
+        expiry=now + SESSION_TIMEOUT_SECONDS,
+        last_activity=now
+    )
+    USER_INDEX[user_id].add(agent_id)
     
     return session_id, session
 
-async def cleanup_expired_session(user_id: str, agent_id: str, session_info: Dict[str, Any]):
+async def cleanup_expired_session(user_id: str, agent_id: str, session_info: SessionRec):
     """Clean up expired session and optionally add to memory"""
     try:
         # Get the session from service
         session = await session_service.get_session(
             app_name="adk_app",
             user_id=user_id,
-            session_id=session_info['session_id']
+            session_id=session_info.session_id
         )
         
         # If session has meaningful content, add to memory
         if session and len(session.events) > 2:  # More than just start/end events
             await memory_service.add_session_to_memory(session)
-            print(f"Added session {session_info['session_id']} to memory")
+            logger.debug("Added session {} to memory", session_info.session_id)
         
         # Delete session from service
         await session_service.delete_session(
             app_name="adk_app",
             user_id=user_id,
-            session_id=session_info['session_id']
+            session_id=session_info.session_id
         )
         
-    except Exception as e:
-        print(f"Error cleaning up session: {e}")
+    except Exception:
+        logger.exception("Error cleaning up session")
     
     # Remove from tracking
-    if user_id in USER_SESSIONS and agent_id in USER_SESSIONS[user_id]:
-        del USER_SESSIONS[user_id][agent_id]
+    if USER_SESSIONS.pop((user_id, agent_id), None) is not None:
+        agent_ids = USER_INDEX.get(user_id)
+        if agent_ids is not None:
+            agent_ids.discard(agent_id)
+            if not agent_ids:
+                del USER_INDEX[user_id]
 
 async def update_session_activity(user_id: str, agent_id: str):
     """Update last activity time for session"""
-    if user_id in USER_SESSIONS and agent_id in USER_SESSIONS[user_id]:
-        USER_SESSIONS[user_id][agent_id]['last_activity'] = datetime.now()
-        USER_SESSIONS[user_id][agent_id]['message_count'] += 1
+    session_info = USER_SESSIONS.get((user_id, agent_id))
+    if session_info is not None:
+        session_info.last_activity = time.monotonic()
+        session_info.message_count += 1
 
 @app.get("/")
 async def root():
@@ -306,27 +329,27 @@ async def get_streaming_stats():
 @app.get("/sessions")
 async def get_user_sessions(user_id: str = "default_user"):
     """Get active sessions for a user"""
-    user_sessions = USER_SESSIONS.get(user_id, {})
+    active_sessions = {}
+    for agent_id in USER_INDEX.get(user_id, ()):
+        info = USER_SESSIONS[(user_id, agent_id)]
+        active_sessions[agent_id] = {
+            "session_id": info.session_id,
+            "created_at": _monotonic_to_datetime(info.created_at).isoformat(),
+            "last_activity": _monotonic_to_datetime(info.last_activity).isoformat(),
+            "message_count": info.message_count
+        }
     return {
         "user_id": user_id,
-        "active_sessions": {
-            agent_id: {
-                "session_id": info["session_id"],
-                "created_at": info["created_at"].isoformat(),
-                "last_activity": info["last_activity"].isoformat(),
-                "message_count": info["message_count"]
-            }
-            for agent_id, info in user_sessions.items()
-        }
+        "active_sessions": active_sessions
     }
 
 @app.delete("/sessions/{agent_id}")
 async def end_session(agent_id: str, user_id: str = "default_user"):
     """End a specific session and add to memory if meaningful"""
-    if user_id in USER_SESSIONS and agent_id in USER_SESSIONS[user_id]:
-        session_info = USER_SESSIONS[user_id][agent_id]
+    session_info = USER_SESSIONS.get((user_id, agent_id))
+    if session_info is not None:
         await cleanup_expired_session(user_id, agent_id, session_info)
-        return {"message": f"Session ended for {agent_id}", "session_id": session_info["session_id"]}
+        return {"message": f"Session ended for {agent_id}", "session_id": session_info.session_id}
     else:
         raise HTTPException(status_code=404, detail="Session not found")
 
@@ -424,4 +447,4 @@ async def get_gmail_status():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=8000, access_log=False)
\ No newline at end of file
@@ -2,12 +2,37 @@
 Memory and Session Management Handler
 """
 
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, AsyncGenerator, List, Optional, Set, Tuple
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from google.adk.sessions import InMemorySessionService, Session
 from google.adk.memory import InMemoryMemoryService
-from config import SESSION_TIMEOUT, DEFAULT_APP_NAME, MEMORY_THRESHOLD_EVENTS
+from config import (
+    SESSION_TIMEOUT, DEFAULT_APP_NAME, MEMORY_THRESHOLD_EVENTS, MEMORY_ADMISSION_THRESHOLD,
+    MEMORY_SEARCH_CACHE_SIZE, MEMORY_SEARCH_CACHE_TTL_SECONDS
+)
 import asyncio
+import heapq
+import math
+import secrets
+import sys
+import time
+import weakref
+import orjson
+from loguru import logger
+
+SESSION_TIMEOUT_SECONDS = SESSION_TIMEOUT.total_seconds()
+
+@dataclass(slots=True)
+class SessionRecord:
+    """Tracked ADK session for a user-agent combination"""
+    session_id: str
+    session: Session
+    created_at: datetime
+    last_activity: datetime
+    expires_at: float  # time.monotonic() deadline
+    message_count: int = 0
 
 class MemoryHandler:
     """Handles session lifecycle and memory management"""
@@ -15,115 +40,185 @@ class MemoryHandler:
     def __init__(self, session_service=None, memory_service=None):
         self.session_service = session_service or InMemorySessionService()
         self.memory_service = memory_service or InMemoryMemoryService()
-        self.user_sessions: Dict[str, Dict[str, Any]] = {}
+        self.user_sessions: Dict[Tuple[str, str], SessionRecord] = {}  # (user_id, agent_id) -> record
+        self._user_index: Dict[str, Set[str]] = defaultdict(set)  # user_id -> {agent_id}
+        # Min-heap of (monotonic deadline, user_id, agent_id, session_id) for expiry sweeps
+        self._expiry_heap: List[Tuple[float, str, str, str]] = []
+        # Per-user locks, dropped automatically once no request holds or awaits them
+        self._user_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+        # Running message total across tracked sessions, kept in step with user_sessions
+        self._total_messages = 0
+        # LRU of (query, user_id, app_name) -> (monotonic expiry, search result)
+        self._search_cache: "OrderedDict[Tuple[str, str, str], Tuple[float, Dict[str, Any]]]" = OrderedDict()
         
     async def get_or_create_session(self, user_id: str, agent_id: str, app_name: str = DEFAULT_APP_NAME) -> Tuple[str, Session]:
         """Get existing session or create new one for user-agent combination"""
-        current_time = datetime.now()
-        
-        # Initialize user sessions if not exists
-        if user_id not in self.user_sessions:
-            self.user_sessions[user_id] = {}
-        
-        # Check if session exists and is not expired
-        if agent_id in self.user_sessions[user_id]:
-            session_info = self.user_sessions[user_id][agent_id]
-            if current_time - session_info['created_at'] < SESSION_TIMEOUT:
-                # Session is still valid, return existing session
-                return session_info['session_id'], session_info['session']
-            else:
-                # Session expired, clean it up
-                await self._cleanup_expired_session(user_id, agent_id, session_info)
+        # Share one string object per id across keys, records and the user index
+        user_id = sys.intern(user_id)
+        agent_id = sys.intern(agent_id)
+        now = time.monotonic()
         
-        # Create new session
-        session_id = f"{user_id}_{agent_id}_{int(current_time.timestamp())}"
-        session = await self.session_service.create_session(
-            app_name=app_name,
-            user_id=user_id,
-            session_id=session_id,
-            state={
-                "user:agent_preference": agent_id,
-                "session_start_time": current_time.isoformat(),
-                "conversation_count": 0
-            }
-        )
+        # Fast path: valid session exists, no locking needed
+        session_info = self.user_sessions.get((user_id, agent_id))
+        if session_info is not None and now < session_info.expires_at:
+            return session_info.session_id, session_info.session
         
-        # Store session info
-        self.user_sessions[user_id][agent_id] = {
-            'session_id': session_id,
-            'session': session,
-            'created_at': current_time,
-            'last_activity': current_time,
-            'message_count': 0
-        }
+        # Serialize check-and-create per user so concurrent requests don't
+        # create duplicate sessions; other users are never blocked
+        async with self._get_user_lock(user_id):
+            now = time.monotonic()
+            
+            # Check if session exists and is not expired
+            session_info = self.user_sessions.get((user_id, agent_id))
+            if session_info is not None:
+                if now < session_info.expires_at:
+                    # Session was created while we waited for the lock
+                    return session_info.session_id, session_info.session
+                else:
+                    # Session expired, clean it up
+                    await self._cleanup_expired_session(user_id, agent_id, session_info)
+            
+            # Create new session
+            current_time = datetime.now()
+            expires_at = now + SESSION_TIMEOUT_SECONDS
+            session_id = "_".join((user_id, agent_id, secrets.token_hex(6)))
+            session = await self.session_service.create_session(
+                app_name=app_name,
+                user_id=user_id,
+                session_id=session_id,
+                state={
+                    "user:agent_preference": agent_id,
+                    "session_start_time": current_time.isoformat(),
+                    "conversation_count": 0
+                }
+            )
+            
+            # Store session info
+            self.user_sessions[(user_id, agent_id)] = SessionRecord(
+                session_id=session_id,
+                session=session,
+                created_at=current_time,
+                last_activity=current_time,
+                expires_at=expires_at
+            )
+            self._user_index[user_id].add(agent_id)
+            heapq.heappush(self._expiry_heap, (expires_at, user_id, agent_id, session_id))
         
         return session_id, session
 
-    async def _cleanup_expired_session(self, user_id: str, agent_id: str, session_info: Dict[str, Any]):
+    def _get_user_lock(self, user_id: str) -> asyncio.Lock:
+        """Get the per-user lock, creating it on first use"""
+        lock = self._user_locks.get(user_id)
+        if lock is None:
+            lock = self._user_locks[user_id] = asyncio.Lock()
+        return lock
+
+    async def _cleanup_expired_session(self, user_id: str, agent_id: str, session_info: SessionRecord):
         """Clean up expired session and optionally add to memory"""
+        # Claim the record before the first await so a concurrent sweep,
+        # request or end_session can't clean up the same session twice
+        key = (user_id, agent_id)
+        tracked = self.user_sessions.get(key)
+        if tracked is None or tracked.session_id != session_info.session_id:
+            return
+        del self.user_sessions[key]
+        self._total_messages -= tracked.message_count
+        agent_ids = self._user_index.get(user_id)
+        if agent_ids is not None:
+            agent_ids.discard(agent_id)
+            if not agent_ids:
+                del self._user_index[user_id]
+        
         try:
             # Get the session from service
             session = await self.session_service.get_session(
                 app_name=DEFAULT_APP_NAME,
                 user_id=user_id,
-                session_id=session_info['session_id']
+                session_id=session_info.session_id
             )
             
             # If session has meaningful content, add to memory
-            if session and len(session.events) > MEMORY_THRESHOLD_EVENTS:
+            if session and self._should_add_to_memory(session, session_info):
                 await self.memory_service.add_session_to_memory(session)
-                print(f"Added session {session_info['session_id']} to memory")
+                # New memories may change any cached search result
+                self._search_cache.clear()
+                logger.debug("Added session {} to memory", session_info.session_id)
             
             # Delete session from service
             await self.session_service.delete_session(
                 app_name=DEFAULT_APP_NAME,
                 user_id=user_id,
-                session_id=session_info['session_id']
+                session_id=session_info.session_id
             )
             
-        except Exception as e:
-            print(f"Error cleaning up session: {e}")
+        except Exception:
+            logger.exception("Error cleaning up session")
+
+    @staticmethod
+    def _should_add_to_memory(session: Session, session_info: SessionRecord) -> bool:
+        """Admit only sessions with enough conversation to be worth searching later"""
+        if len(session.events) <= MEMORY_THRESHOLD_EVENTS:
+            return False
+        
+        text_chars = 0
+        for event in session.events:
+            content = getattr(event, 'content', None)
+            for part in getattr(content, 'parts', None) or ():
+                if getattr(part, 'text', None):
+                    text_chars += len(part.text)
         
-        # Remove from tracking
-        if user_id in self.user_sessions and agent_id in self.user_sessions[user_id]:
-            del self.user_sessions[user_id][agent_id]
+        score = math.log(session_info.message_count + 1) * math.log(text_chars + 1)
+        return score > MEMORY_ADMISSION_THRESHOLD
 
     async def update_session_activity(self, user_id: str, agent_id: str):
         """Update last activity time for session"""
-        if user_id in self.user_sessions and agent_id in self.user_sessions[user_id]:
-            self.user_sessions[user_id][agent_id]['last_activity'] = datetime.now()
-            self.user_sessions[user_id][agent_id]['message_count'] += 1
+        session_info = self.user_sessions.get((user_id, agent_id))
+        if session_info is not None:
+            session_info.last_activity = datetime.now()
+            session_info.message_count += 1
+            self._total_messages += 1
 
     async def end_session(self, user_id: str, agent_id: str) -> Optional[str]:
         """End a specific session and add to memory if meaningful"""
-        if user_id in self.user_sessions and agent_id in self.user_sessions[user_id]:
-            session_info = self.user_sessions[user_id][agent_id]
+        session_info = self.user_sessions.get((user_id, agent_id))
+        if session_info is not None:
             await self._cleanup_expired_session(user_id, agent_id, session_info)
-            return session_info["session_id"]
+            return session_info.session_id
         return None
 
     def get_user_sessions(self, user_id: str) -> Dict[str, Any]:
-        """Get active sessions for a user"""
-        user_sessions = self.user_sessions.get(user_id, {})
-        return {
-            agent_id: {
-                "session_id": info["session_id"],
-                "created_at": info["created_at"].isoformat(),
-                "last_activity": info["last_activity"].isoformat(),
-                "message_count": info["message_count"]
+        """Get active sessions for a user
+
+        Timestamps are left as datetimes for orjson to encode directly.
+        """
+        active_sessions = {}
+        for agent_id in self._user_index.get(user_id, ()):
+            info = self.user_sessions[(user_id, agent_id)]
+            active_sessions[agent_id] = {
+                "session_id": info.session_id,
+                "created_at": info.created_at,
+                "last_activity": info.last_activity,
+                "message_count": info.message_count
             }
-            for agent_id, info in user_sessions.items()
-        }
+        return active_sessions
 
     async def search_memory(self, query: str, user_id: str = "default_user", app_name: str = DEFAULT_APP_NAME):
         """Search memory for past conversations"""
+        cache_key = (query, user_id, app_name)
+        cached = self._search_cache.get(cache_key)
+        if cached is not None:
+            if time.monotonic() < cached[0]:
+                self._search_cache.move_to_end(cache_key)
+                return cached[1]
+            del self._search_cache[cache_key]
+        
         try:
             results = await self.memory_service.search_memory(
                 app_name=app_name,
                 user_id=user_id,
                 query=query
             )
-            return {
+            search_result = {
                 "query": query,
                 "results": [
                     {
@@ -136,34 +231,63 @@ class MemoryHandler:
             }
         except Exception as e:
             raise Exception(f"Memory search failed: {str(e)}")
+        
+        self._search_cache[cache_key] = (time.monotonic() + MEMORY_SEARCH_CACHE_TTL_SECONDS, search_result)
+        if len(self._search_cache) > MEMORY_SEARCH_CACHE_SIZE:
+            self._search_cache.popitem(last=False)
+        return search_result
+
+    @staticmethod
+    async def iter_memory_ndjson(query: str, results: List[Dict[str, Any]]) -> AsyncGenerator[bytes, None]:
+        """Encode already-normalized memory search results one NDJSON line at a time"""
+        yield orjson.dumps({"query": query}) + b"\n"
+        for result in results:
+            yield orjson.dumps(result) + b"\n"
 
     async def cleanup_expired_sessions(self):
         """Cleanup all expired sessions (can be called periodically)"""
-        current_time = datetime.now()
+        now = time.monotonic()
         expired_sessions = []
         
-        for user_id, user_sessions in self.user_sessions.items():
-            for agent_id, session_info in user_sessions.items():
-                if current_time - session_info['created_at'] >= SESSION_TIMEOUT:
-                    expired_sessions.append((user_id, agent_id, session_info))
+        # Only pop entries whose deadline has passed; skip stale entries for
+        # sessions that were already ended or replaced
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            _, user_id, agent_id, session_id = heapq.heappop(heap)
+            session_info = self.user_sessions.get((user_id, agent_id))
+            if session_info is not None and session_info.session_id == session_id:
+                expired_sessions.append((user_id, agent_id, session_info))
         
-        for user_id, agent_id, session_info in expired_sessions:
-            await self._cleanup_expired_session(user_id, agent_id, session_info)
+        # Clean up concurrently so service round-trips overlap
+        results = await asyncio.gather(
+            *(
+                self._cleanup_expired_session(user_id, agent_id, session_info)
+                for user_id, agent_id, session_info in expired_sessions
+            ),
+            return_exceptions=True
+        )
+        for (user_id, agent_id, _), result in zip(expired_sessions, results):
+            if isinstance(result, BaseException):
+                logger.error("Error cleaning up session for {}/{}: {}", user_id, agent_id, result)
         
         return len(expired_sessions)
 
+    async def run_cleanup_loop(self, interval_seconds: float):
+        """Periodically cleanup expired sessions until the task is cancelled"""
+        while True:
+            try:
+                expired = await self.cleanup_expired_sessions()
+                if expired:
+                    logger.debug("Cleaned up {} expired sessions", expired)
+            except Exception:
+                logger.exception("Error in session cleanup loop")
+            await asyncio.sleep(interval_seconds)
+
     def get_session_stats(self) -> Dict[str, Any]:
         """Get session statistics"""
-        total_sessions = sum(len(user_sessions) for user_sessions in self.user_sessions.values())
-        total_messages = sum(
-            session_info['message_count'] 
-            for user_sessions in self.user_sessions.values()
-            for session_info in user_sessions.values()
-        )
-        
         return {
-            "total_users": len(self.user_sessions),
-            "total_active_sessions": total_sessions,
-            "total_messages": total_messages,
+            "total_users": len(self._user_index),
+            "total_active_sessions": len(self.user_sessions),
+            "total_messages": self._total_messages,
             "session_timeout_hours": SESSION_TIMEOUT.total_seconds() / 3600
         }
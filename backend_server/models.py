@@ -2,7 +2,7 @@
 Pydantic models for API requests and responses
 """
 
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 
@@ -86,3 +86,6 @@ class HealthResponse(BaseModel):
     message: str
     status: str = "healthy"
     timestamp: str
+
+# Adapters compiled once at import for request bodies parsed outside FastAPI's own decoding
+AGENT_REQUEST_ADAPTER = TypeAdapter(AgentRequest)
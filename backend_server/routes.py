@@ -2,10 +2,19 @@
 API Routes for the Agent Server
 """
 
-from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 from typing import Dict, Any
-from models import *
+from pydantic import ValidationError
+from models import (
+    AgentRequest, AgentResponse, AgentListResponse, AgentDetailResponse,
+    UserSessionsResponse, SessionEndResponse,
+    MemorySearchRequest, MemorySearchResponse,
+    GmailTokenRequest, GmailTokenResponse,
+    HealthResponse, StreamingStatsResponse,
+    AGENT_REQUEST_ADAPTER
+)
 from controllers import AgentController, SessionController, MemoryController, GmailController, SystemController
 
 def create_routes(
@@ -20,13 +29,13 @@ def create_routes(
     router = APIRouter()
 
     # Health and System Routes
-    @router.get("/", response_model=HealthResponse)
-    async def root():
+    @router.get("/", response_model=None, responses={200: {"model": HealthResponse}})
+    async def root() -> HealthResponse:
         """Health check endpoint"""
         return system_controller.get_health()
 
-    @router.get("/health", response_model=HealthResponse)
-    async def health_check():
+    @router.get("/health", response_model=None, responses={200: {"model": HealthResponse}})
+    async def health_check() -> HealthResponse:
         """Detailed health check"""
         return system_controller.get_health()
 
@@ -36,24 +45,41 @@ def create_routes(
         return system_controller.get_system_stats()
 
     # Agent Routes
-    @router.get("/agents", response_model=AgentListResponse)
-    async def list_agents():
+    @router.get("/agents", response_model=None, responses={200: {"model": AgentListResponse}})
+    async def list_agents() -> Response:
         """List all available agents"""
         return agent_controller.list_agents()
 
-    @router.get("/agent/{agent_id}/details", response_model=AgentDetailResponse)
-    async def get_agent_details(agent_id: str):
+    @router.get("/agent/{agent_id}/details", response_model=None, responses={200: {"model": AgentDetailResponse}})
+    async def get_agent_details(agent_id: str) -> Response:
         """Get detailed information about a specific agent"""
-        return agent_controller.get_agent_details(agent_id)
+        return agent_controller.get_agent_details_response(agent_id)
 
-    @router.post("/agent/{agent_id}", response_model=AgentResponse)
-    async def call_agent(agent_id: str, request: AgentRequest):
+    @router.post("/agent/{agent_id}", response_model=None, responses={200: {"model": AgentResponse}})
+    async def call_agent(agent_id: str, request: AgentRequest) -> AgentResponse:
         """Call a specific agent by ID (non-streaming)"""
         return await agent_controller.call_agent_sync(agent_id, request)
 
-    @router.post("/agent/{agent_id}/stream")
-    async def stream_agent(agent_id: str, request: AgentRequest):
+    @router.post(
+        "/agent/{agent_id}/stream",
+        openapi_extra={
+            "requestBody": {
+                "required": True,
+                "content": {"application/json": {"schema": AgentRequest.model_json_schema()}}
+            }
+        }
+    )
+    async def stream_agent(agent_id: str, http_request: Request):
         """Call a specific agent by ID with streaming response"""
+        # Validate the raw body with the precompiled adapter
+        try:
+            request = AGENT_REQUEST_ADAPTER.validate_json(await http_request.body())
+        except ValidationError as e:
+            # Match FastAPI's own body errors, whose locations start at "body"
+            raise RequestValidationError(
+                [{**err, "loc": ("body", *err["loc"])} for err in e.errors()]
+            )
+        
         stream_generator = await agent_controller.stream_agent(agent_id, request)
         
         return StreamingResponse(
@@ -67,31 +93,38 @@ def create_routes(
         )
 
     # Session Management Routes
-    @router.get("/sessions", response_model=UserSessionsResponse)
-    async def get_user_sessions(user_id: str = Query(default="default_user")):
+    @router.get("/sessions", response_model=None, responses={200: {"model": UserSessionsResponse}})
+    async def get_user_sessions(user_id: str = Query(default="default_user")) -> ORJSONResponse:
         """Get active sessions for a user"""
         return session_controller.get_user_sessions(user_id)
 
-    @router.delete("/sessions/{agent_id}", response_model=SessionEndResponse)
-    async def end_session(agent_id: str, user_id: str = Query(default="default_user")):
+    @router.delete("/sessions/{agent_id}", response_model=None, responses={200: {"model": SessionEndResponse}})
+    async def end_session(agent_id: str, user_id: str = Query(default="default_user")) -> SessionEndResponse:
         """End a specific session and add to memory if meaningful"""
         return await session_controller.end_session(agent_id, user_id)
 
     # Memory Routes
-    @router.post("/memory/search", response_model=MemorySearchResponse)
-    async def search_memory(request: MemorySearchRequest):
+    @router.post("/memory/search", response_model=None, responses={200: {"model": MemorySearchResponse}})
+    async def search_memory(request: MemorySearchRequest) -> MemorySearchResponse:
         """Search memory for past conversations"""
         return await memory_controller.search_memory(request)
 
+    @router.post("/memory/search/stream")
+    async def stream_search_memory(request: MemorySearchRequest):
+        """Search memory for past conversations, streaming one NDJSON line per match"""
+        stream_generator = await memory_controller.stream_search_memory(request)
+        
+        return StreamingResponse(stream_generator, media_type="application/x-ndjson")
+
     # Streaming Routes
-    @router.get("/streaming/stats", response_model=StreamingStatsResponse)
-    async def get_streaming_stats():
+    @router.get("/streaming/stats", response_model=None, responses={200: {"model": StreamingStatsResponse}})
+    async def get_streaming_stats() -> StreamingStatsResponse:
         """Get streaming statistics"""
         return system_controller.get_streaming_stats()
 
     # Gmail Routes
-    @router.post("/gmail/tokens", response_model=GmailTokenResponse)
-    async def set_gmail_tokens(token_request: GmailTokenRequest):
+    @router.post("/gmail/tokens", response_model=None, responses={200: {"model": GmailTokenResponse}})
+    async def set_gmail_tokens(token_request: GmailTokenRequest) -> GmailTokenResponse:
         """Set Gmail OAuth tokens for dynamic authentication"""
         return await gmail_controller.set_gmail_tokens(token_request)
 
@@ -4,13 +4,16 @@ Handles real-time streaming of agent responses with optimized performance
 """
 
 import asyncio
-import json
+import os
+import re
 import time
 import uuid
-from typing import Dict, List, Optional, Any, AsyncGenerator, Callable
+import weakref
+from typing import Dict, List, Optional, Any, AsyncGenerator, Callable, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
+import orjson
 from loguru import logger
 
 from google.adk.runners import Runner
@@ -18,6 +21,42 @@ from google.adk.agents.run_config import RunConfig, StreamingMode
 from google.adk.sessions import InMemorySessionService
 from google.genai.types import Content, Part
 
+# Log every raw ADK event only when explicitly requested; checked once at import.
+# Opting in is explicit, so the dump goes out at INFO and passes the default sink
+_DEBUG_EVENTS = os.environ.get("ADK_DEBUG_EVENTS") == "1"
+
+# Bounded hand-off between a producer task and its consuming loop
+_EVENT_QUEUE_SIZE = 64
+_EVENTS_END = object()
+
+# Tool results that look like a JSON object, matched without stripping a copy
+_JSON_OBJECT_START = re.compile(r"\s*\{")
+
+# is_final_response probe per ADK event class, resolved on first sight
+_FINAL_RESPONSE_PROBES: Dict[type, Optional[Callable[[Any], Any]]] = {}
+
+
+def _is_final_response(event) -> bool:
+    """Call event.is_final_response() via a per-class cached lookup"""
+    event_cls = type(event)
+    try:
+        probe = _FINAL_RESPONSE_PROBES[event_cls]
+    except KeyError:
+        probe = getattr(event_cls, 'is_final_response', None)
+        if not callable(probe):
+            probe = None
+        _FINAL_RESPONSE_PROBES[event_cls] = probe
+    return probe is not None and bool(probe(event))
+
+
+# Fixed status prefixes for tool and sub-agent events
+_SUB_AGENT_START_PREFIX = "🚀 Starting sub-agent: "
+_SUB_AGENT_COMPLETE_PREFIX = "🏁 Completed sub-agent: "
+_TOOL_CALL_PREFIX = "🔧 Calling tool: "
+_TOOL_COMPLETED_PREFIX = "✅ Tool completed: "
+_TOOL_RESULT_PREFIX = "✅ Tool '"
+_TOOL_RESULT_SUFFIX = "' completed"
+
 
 class StreamingEventType(Enum):
     """Types of streaming events"""
@@ -33,7 +72,49 @@ class StreamingEventType(Enum):
     METADATA = "metadata"
 
 
-@dataclass
+# Pre-encoded SSE frame scaffolding, looked up per event instead of rebuilt
+_SSE_PREFIXES: Dict[StreamingEventType, bytes] = {
+    event_type: b'data: {"type":"' + event_type.value.encode() + b'","content":'
+    for event_type in StreamingEventType
+}
+_SSE_METADATA_SEP = b',"metadata":'
+_SSE_TIMESTAMP_SEP = b',"timestamp":'
+_SSE_FRAME_END = b'}\n\n'
+_SSE_DONE = b"data: [DONE]\n\n"
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _make_sse_encoder(event_type: StreamingEventType) -> Callable[[str, Dict[str, Any], float], bytes]:
+    """Build an SSE frame encoder with this event type's scaffolding baked in"""
+    prefix = _SSE_PREFIXES[event_type]
+    # START/COMPLETE frames carry no content, so their head is fully static
+    empty_head = prefix + b'""' + _SSE_METADATA_SEP
+    dumps = orjson.dumps
+    join = b"".join
+
+    def encode(content: str, metadata: Dict[str, Any], timestamp: float) -> bytes:
+        # Gather the pieces and copy them once, writev-style, rather than
+        # growing a new bytes object per concatenation
+        if content:
+            return join((
+                prefix, dumps(content), _SSE_METADATA_SEP,
+                dumps(metadata, option=_ORJSON_OPTIONS),
+                _SSE_TIMESTAMP_SEP, dumps(timestamp), _SSE_FRAME_END
+            ))
+        return join((
+            empty_head, dumps(metadata, option=_ORJSON_OPTIONS),
+            _SSE_TIMESTAMP_SEP, dumps(timestamp), _SSE_FRAME_END
+        ))
+
+    return encode
+
+
+_SSE_ENCODERS: Dict[StreamingEventType, Callable[[str, Dict[str, Any], float], bytes]] = {
+    event_type: _make_sse_encoder(event_type) for event_type in StreamingEventType
+}
+
+
+@dataclass(slots=True)
 class StreamingEvent:
     """Streaming event data structure"""
     type: StreamingEventType
@@ -44,18 +125,108 @@ class StreamingEvent:
     agent_id: Optional[str] = None
 
 
+# Recycled StreamingEvent instances for the per-token content path
+_EVENT_POOL_MAX = 256
+_event_pool: List[StreamingEvent] = []
+
+
+def _acquire_event(event_type: StreamingEventType, content: str, session_id: str,
+                   agent_id: str, metadata: Dict[str, Any]) -> StreamingEvent:
+    """Take a StreamingEvent from the pool, or build one if the pool is empty"""
+    if not _event_pool:
+        return StreamingEvent(
+            type=event_type,
+            content=content,
+            session_id=session_id,
+            agent_id=agent_id,
+            metadata=metadata
+        )
+    event = _event_pool.pop()
+    event.type = event_type
+    event.content = content
+    event.metadata = metadata
+    event.timestamp = time.time()
+    event.session_id = session_id
+    event.agent_id = agent_id
+    return event
+
+
+def _release_event(event: StreamingEvent):
+    """Return a StreamingEvent to the pool once it has been serialized"""
+    if len(_event_pool) < _EVENT_POOL_MAX:
+        event.content = ""
+        event.metadata.clear()
+        _event_pool.append(event)
+
+
+class _AccumulatedContent:
+    """Streamed text for one session, tracking its stripped length incrementally"""
+
+    __slots__ = ("_parts", "_length", "_leading_ws", "_trailing_ws", "_seen_text")
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Drop accumulated text, e.g. after a tool call"""
+        self._parts: List[str] = []
+        self._length = 0
+        self._leading_ws = 0
+        self._trailing_ws = 0
+        self._seen_text = False
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def text(self) -> str:
+        """Join the chunks, collapsing them so repeated reads stay cheap"""
+        if len(self._parts) > 1:
+            self._parts[:] = ["".join(self._parts)]
+        return self._parts[0] if self._parts else ""
+
+    def append(self, chunk: str):
+        """Append a chunk and update the leading/trailing whitespace counts"""
+        self._parts.append(chunk)
+        self._length += len(chunk)
+        stripped_right = chunk.rstrip()
+        if not stripped_right:
+            # Whitespace-only chunk extends whichever edge we are at
+            if self._seen_text:
+                self._trailing_ws += len(chunk)
+            else:
+                self._leading_ws += len(chunk)
+            return
+        if not self._seen_text:
+            self._leading_ws += len(chunk) - len(chunk.lstrip())
+            self._seen_text = True
+        self._trailing_ws = len(chunk) - len(stripped_right)
+
+    @property
+    def stripped_len(self) -> int:
+        """len(self.text.strip()) without building the stripped string"""
+        return self._length - self._leading_ws - self._trailing_ws
+
+    def stripped(self) -> str:
+        return self.text.strip()
+
+
 @dataclass
 class StreamingSession:
     """Active streaming session"""
     session_id: str
     agent_id: str
     user_id: str
-    started_at: datetime = field(default_factory=datetime.now)
-    last_activity: datetime = field(default_factory=datetime.now)
+    # Wall-clock start for reporting; monotonic activity stamp for the hot loop
+    started_at: float = field(default_factory=time.time)
+    last_activity: float = field(default_factory=time.monotonic)
     is_active: bool = True
     total_tokens: int = 0
     events_sent: int = 0
     buffer: List[str] = field(default_factory=list)
+    # Per-event bookkeeping lives here so the hot loop does no dict lookups
+    accumulated: _AccumulatedContent = field(default_factory=_AccumulatedContent)
+    chunk_counter: int = 0
 
 
 class StreamingHandler:
@@ -67,6 +238,7 @@ class StreamingHandler:
     def __init__(self, 
                  update_interval_ms: int = 8,   # 120fps for smoother streaming
                  batch_size: int = 1,           # Send each chunk immediately
+                 flush_threshold_chars: int = 1024,
                  agent_manager=None,
                  session_service=None,
                  memory_service=None):
@@ -76,34 +248,25 @@ class StreamingHandler:
         Args:
             update_interval_ms: Update interval in milliseconds (default: 16ms for 60fps)
             batch_size: Number of content chunks to batch before sending (default: 3)
+            flush_threshold_chars: Coalesced SSE content size that forces a flush
             agent_manager: Agent manager instance for team coordination
         """
         self.update_interval = update_interval_ms / 1000  # Convert to seconds
         self.batch_size = batch_size
+        self.flush_threshold_chars = flush_threshold_chars
         self.agent_manager = agent_manager
         self.session_service = session_service
         self.memory_service = memory_service
         self.buffer_timeout = 0.01  # Reduced timeout for more responsive streaming
         
-        # Session management
-        self._active_sessions: Dict[str, StreamingSession] = {}
-        self._event_callbacks: Dict[str, List[Callable]] = {}
-        
-        # Content buffering for smooth streaming
-        self._content_buffers: Dict[str, List[str]] = {}
-        self._last_flush_time: Dict[str, float] = {}
-        
-        # Track accumulated content to prevent duplicates
-        self._accumulated_content: Dict[str, str] = {}
-        
-        # Debug tracking
-        self._chunk_counters: Dict[str, int] = {}
-        self._event_counters: Dict[str, int] = {}
+        # Session management: entries live as long as their streaming generator
+        self._active_sessions: "weakref.WeakValueDictionary[str, StreamingSession]" = weakref.WeakValueDictionary()
         
         logger.info(f"Streaming handler initialized (interval: {update_interval_ms}ms, batch: {batch_size})")
 
     async def start_streaming_session(self, session_id: str, agent_id: str, user_id: str, 
-                                     agent, message: str, adk_session=None) -> AsyncGenerator[StreamingEvent, None]:
+                                     agent, message: str, adk_session=None,
+                                     with_metadata: bool = True) -> AsyncGenerator[StreamingEvent, None]:
         """
         Start a streaming session with an agent using proper ADK streaming
         
@@ -113,11 +276,13 @@ class StreamingHandler:
             user_id: User identifier
             agent: ADK Agent instance
             message: User message string
+            with_metadata: Build content and tool-result metadata (off for callers that only read content)
             
         Yields:
             StreamingEvent: Stream of events
         """
         start_time = time.time()
+        producer = None
         
         logger.debug(f"Starting streaming session {session_id} for agent {agent_id}")
         
@@ -130,9 +295,6 @@ class StreamingHandler:
             )
             
             self._active_sessions[session_id] = streaming_session
-            self._accumulated_content[session_id] = ""
-            self._chunk_counters[session_id] = 0
-            self._event_counters[session_id] = 0
             
             # Send start event
             yield StreamingEvent(
@@ -141,7 +303,7 @@ class StreamingHandler:
                 agent_id=agent_id,
                 metadata={
                     "user_id": user_id,
-                    "started_at": streaming_session.started_at.isoformat(),
+                    "started_at": datetime.fromtimestamp(streaming_session.started_at).isoformat(),
                     "streaming_mode": "ADK_SSE"
                 }
             )
@@ -176,62 +338,91 @@ class StreamingHandler:
             
             logger.info(f"Starting ADK streaming for session {session_id}")
             
-            # Run with proper ADK streaming
-            async for event in runner.run_async(
-                user_id=user_id,
-                session_id=session.id,
-                new_message=Content(role="user", parts=[Part(text=message)]),
-                run_config=run_config
-            ):
-                streaming_session.last_activity = datetime.now()
-                self._event_counters[session_id] += 1
+            # Run with proper ADK streaming; a producer task drains the runner
+            # so the next ADK event is fetched while this one is being sent
+            adk_events: asyncio.Queue = asyncio.Queue(maxsize=_EVENT_QUEUE_SIZE)
+            producer = asyncio.create_task(self._drain_events(
+                runner.run_async(
+                    user_id=user_id,
+                    session_id=session.id,
+                    new_message=Content(role="user", parts=[Part(text=message)]),
+                    run_config=run_config
+                ),
+                adk_events
+            ))
+            while True:
+                event = await adk_events.get()
+                if event is _EVENTS_END:
+                    break
+                if isinstance(event, Exception):
+                    raise event
+                streaming_session.last_activity = time.monotonic()
                 
                 # Handle ADK streaming events
                 event_processed = False
- 
-                print("event > ", event)          
-                print("\n\n") 
+                
+                if _DEBUG_EVENTS:
+                    logger.info("event > {}", event)
+                
+                # Snapshot the event attributes we dispatch on, once per event
+                event_type = getattr(event, 'event_type', None)
+                event_agent_name = getattr(event, 'agent_name', None)
+                event_tool_calls = getattr(event, 'tool_calls', None)
+                event_tool_responses = getattr(event, 'tool_responses', None)
+                event_thinking = getattr(event, 'thinking', None)
+                event_content = getattr(event, 'content', None)
+                event_parts = getattr(event_content, 'parts', None) if event_content else None
+                
+                # Sub-agent attribution for content events from this event
+                sub_agent_name = event_agent_name or getattr(event, 'source', None)
+                
                 # Handle sub-agent start events
-                if hasattr(event, 'event_type') and event.event_type == 'sub_agent_start':
+                if event_type == 'sub_agent_start':
                     yield StreamingEvent(
                         type=StreamingEventType.START,
-                        content=f"🚀 Starting sub-agent: {getattr(event, 'agent_name', 'unknown')}",
+                        content=_SUB_AGENT_START_PREFIX + (event_agent_name or 'unknown'),
                         session_id=session_id,
                         agent_id=agent_id,
                         metadata={
-                            "sub_agent_name": getattr(event, 'agent_name', 'unknown'),
+                            "sub_agent_name": event_agent_name or 'unknown',
                             "is_sub_agent_event": True,
                             "event_type": "sub_agent_start"
                         }
                     )
                 
                 # Handle sub-agent completion events
-                if hasattr(event, 'event_type') and event.event_type == 'sub_agent_complete':
+                if event_type == 'sub_agent_complete':
                     yield StreamingEvent(
                         type=StreamingEventType.COMPLETE,
-                        content=f"🏁 Completed sub-agent: {getattr(event, 'agent_name', 'unknown')}",
+                        content=_SUB_AGENT_COMPLETE_PREFIX + (event_agent_name or 'unknown'),
                         session_id=session_id,
                         agent_id=agent_id,
                         metadata={
-                            "sub_agent_name": getattr(event, 'agent_name', 'unknown'),
+                            "sub_agent_name": event_agent_name or 'unknown',
                             "is_sub_agent_event": True,
                             "event_type": "sub_agent_complete"
                         }
                     )
                 
+                # A call reported in tool_calls can reappear as a function_call
+                # part of the same event; remember (name, args) to skip that echo
+                emitted_tool_calls = None
+                
                 # Handle tool calls
-                if hasattr(event, 'tool_calls') and event.tool_calls:
-                    for tool_call in event.tool_calls:
+                if event_tool_calls:
+                    emitted_tool_calls = []
+                    for tool_call in event_tool_calls:
+                        emitted_tool_calls.append(self._tool_call_key(tool_call))
                         sub_agent_info = {}
-                        if hasattr(event, 'agent_name') and event.agent_name:
+                        if event_agent_name:
                             sub_agent_info = {
-                                "sub_agent_name": event.agent_name,
+                                "sub_agent_name": event_agent_name,
                                 "is_sub_agent_tool": True
                             }
                         
                         yield StreamingEvent(
                             type=StreamingEventType.TOOL_CALL,
-                            content=f"🔧 Calling tool: {getattr(tool_call, 'name', str(tool_call))}",
+                            content=_TOOL_CALL_PREFIX + str(getattr(tool_call, 'name', tool_call)),
                             session_id=session_id,
                             agent_id=agent_id,
                             metadata={
@@ -241,18 +432,18 @@ class StreamingHandler:
                         )
                 
                 # Handle tool responses
-                if hasattr(event, 'tool_responses') and event.tool_responses:
-                    for tool_response in event.tool_responses:
+                if event_tool_responses:
+                    for tool_response in event_tool_responses:
                         sub_agent_info = {}
-                        if hasattr(event, 'agent_name') and event.agent_name:
+                        if event_agent_name:
                             sub_agent_info = {
-                                "sub_agent_name": event.agent_name,
+                                "sub_agent_name": event_agent_name,
                                 "is_sub_agent_tool": True
                             }
                         
                         yield StreamingEvent(
                             type=StreamingEventType.TOOL_RESPONSE,
-                            content=f"✅ Tool completed: {getattr(tool_response, 'name', 'tool')}",
+                            content=_TOOL_COMPLETED_PREFIX + str(getattr(tool_response, 'name', 'tool')),
                             session_id=session_id,
                             agent_id=agent_id,
                             metadata={
@@ -262,27 +453,38 @@ class StreamingHandler:
                         )
                 
                 # Handle thinking
-                if hasattr(event, 'thinking') and event.thinking:
+                if event_thinking:
                     yield StreamingEvent(
                         type=StreamingEventType.THINKING,
-                        content=event.thinking,
+                        content=event_thinking,
                         session_id=session_id,
                         agent_id=agent_id
                     )
                 
                 # Process content parts
-                if hasattr(event, 'content') and event.content and hasattr(event.content, 'parts') and not event_processed:
+                if event_parts is not None and not event_processed:
                     has_content = False
+                    is_partial = getattr(event, 'partial', None)
+                    is_final_response = None  # resolved on the first text part
                     
-                    for part_idx, part in enumerate(event.content.parts):
-                        self._chunk_counters[session_id] += 1
-                        chunk_id = f"{session_id}_chunk_{self._chunk_counters[session_id]}"
+                    # Chunk ids are numbered across parts; advance the counter once per event
+                    chunk_base = streaming_session.chunk_counter + 1
+                    streaming_session.chunk_counter += len(event_parts)
+                    
+                    for part_idx, part in enumerate(event_parts):
                         
                         # Check for function calls first
-                        if hasattr(part, 'function_call') and part.function_call:
+                        if part.function_call:
+                            if emitted_tool_calls:
+                                call_key = self._tool_call_key(part.function_call)
+                                if call_key in emitted_tool_calls:
+                                    # Each tool_calls entry suppresses at most one part
+                                    emitted_tool_calls.remove(call_key)
+                                    streaming_session.accumulated.reset()
+                                    continue
                             tool_call_event = StreamingEvent(
                                 type=StreamingEventType.TOOL_CALL,
-                                content=f"🔧 Calling tool: {part.function_call.name}",
+                                content=_TOOL_CALL_PREFIX + str(part.function_call.name),
                                 session_id=session_id,
                                 agent_id=agent_id,
                                 metadata={
@@ -292,119 +494,124 @@ class StreamingHandler:
                                 }
                             )
                             # Reset accumulated content after tool response
-                            self._accumulated_content[session_id] = ""
+                            streaming_session.accumulated.reset()
                             yield tool_call_event
                         
                         # Check for function responses
-                        elif hasattr(part, 'function_response') and part.function_response:
-                            # Parse tool response for better display
-                            tool_result = {}
-                            if hasattr(part.function_response, 'response') and part.function_response.response:
-                                try:
-                                    # Try to parse JSON result
-                                    if 'result' in part.function_response.response:
-                                        result_str = part.function_response.response['result']
-                                        if isinstance(result_str, str) and result_str.strip().startswith('{'):
-                                            tool_result = json.loads(result_str)
-                                except Exception as e:
-                                    logger.debug(f"Could not parse tool result as JSON: {e}")
-                                    tool_result = part.function_response.response
-                            
-                            tool_response_event = StreamingEvent(
-                                type=StreamingEventType.TOOL_RESPONSE,
-                                content=f"✅ Tool '{part.function_response.name}' completed",
-                                session_id=session_id,
-                                agent_id=agent_id,
-                                metadata={
+                        elif part.function_response:
+                            tool_response_metadata = {}
+                            if with_metadata:
+                                # Parse tool response for better display
+                                tool_result = {}
+                                if hasattr(part.function_response, 'response') and part.function_response.response:
+                                    try:
+                                        # Try to parse JSON result
+                                        if 'result' in part.function_response.response:
+                                            result_str = part.function_response.response['result']
+                                            if isinstance(result_str, str) and _JSON_OBJECT_START.match(result_str):
+                                                tool_result = orjson.loads(result_str)
+                                    except Exception as e:
+                                        logger.debug(f"Could not parse tool result as JSON: {e}")
+                                        tool_result = part.function_response.response
+                                
+                                tool_response_metadata = {
                                     "tool_name": part.function_response.name,
                                     "response_id": getattr(part.function_response, 'id', 'unknown'),
                                     "tool_result": tool_result,
                                     "raw_response": part.function_response.response if hasattr(part.function_response, 'response') else {}
                                 }
+                            
+                            tool_response_event = StreamingEvent(
+                                type=StreamingEventType.TOOL_RESPONSE,
+                                content=_TOOL_RESULT_PREFIX + str(part.function_response.name) + _TOOL_RESULT_SUFFIX,
+                                session_id=session_id,
+                                agent_id=agent_id,
+                                metadata=tool_response_metadata
                             )
                             # Reset accumulated content after tool response
-                            self._accumulated_content[session_id] = ""
+                            streaming_session.accumulated.reset()
                             yield tool_response_event
                         
                         # Handle text content
-                        elif part.text and part.text.strip():
+                        elif part.text and (text_stripped := part.text.strip()):
                             # Check ADK event properties
-                            current_accumulated = self._accumulated_content[session_id]
-                            is_partial = getattr(event, 'partial', None)
-                            is_final_response = hasattr(event, 'is_final_response') and callable(event.is_final_response) and event.is_final_response()
+                            accumulated = streaming_session.accumulated
+                            accumulated_len = len(accumulated)
+                            if is_final_response is None:
+                                is_final_response = _is_final_response(event)
                             
-                            # Skip final response events that contain accumulated content
-                            if is_final_response and current_accumulated:
-                                # Check if this final response is a duplicate of accumulated content
-                                if (part.text.strip() == current_accumulated.strip() or 
-                                    (len(part.text) >= len(current_accumulated) * 0.8 and 
-                                     current_accumulated.strip() in part.text.strip())):
+                            if accumulated_len:
+                                # Length guards reject almost every chunk in O(1); the
+                                # stripped buffer is only built when a match is possible
+                                accumulated_stripped_len = accumulated.stripped_len
+                                is_exact_duplicate = False
+                                contains_accumulated = False
+                                accumulated_stripped = None
+                                if len(text_stripped) == accumulated_stripped_len:
+                                    accumulated_stripped = accumulated.stripped()
+                                    is_exact_duplicate = text_stripped == accumulated_stripped
+                                if (len(part.text) >= accumulated_len * 0.8 and
+                                        len(text_stripped) >= accumulated_stripped_len):
+                                    if accumulated_stripped is None:
+                                        accumulated_stripped = accumulated.stripped()
+                                    contains_accumulated = accumulated_stripped in text_stripped
+                                
+                                # Skip final response events that duplicate accumulated content
+                                if is_final_response and (is_exact_duplicate or contains_accumulated):
                                     logger.debug(f"SKIPPING final response duplicate for session {session_id}")
                                     continue
-                            
-                            # Skip non-partial events that duplicate accumulated content (fallback)
-                            if (not is_partial and current_accumulated and 
-                                len(part.text) >= len(current_accumulated) * 0.8 and
-                                current_accumulated.strip() in part.text.strip()):
-                                logger.debug(f"SKIPPING non-partial duplicate for session {session_id}")
-                                continue
-                            
-                            # Skip exact duplicates
-                            if current_accumulated and part.text.strip() == current_accumulated.strip():
-                                logger.debug(f"SKIPPING exact duplicate for session {session_id}")
-                                continue
+                                
+                                # Skip non-partial events that duplicate accumulated content (fallback)
+                                if not is_partial and contains_accumulated:
+                                    logger.debug(f"SKIPPING non-partial duplicate for session {session_id}")
+                                    continue
+                                
+                                # Skip exact duplicates
+                                if is_exact_duplicate:
+                                    logger.debug(f"SKIPPING exact duplicate for session {session_id}")
+                                    continue
                             
                             streaming_session.events_sent += 1
                             has_content = True
                             
-                            # Update accumulated content only for streaming chunks (partial events or first chunk)
-                            old_accumulated_len = len(self._accumulated_content[session_id])
-                            
                             # Only accumulate if this is a partial event or we have no accumulated content yet
-                            if is_partial or old_accumulated_len == 0:
-                                self._accumulated_content[session_id] += part.text
+                            if is_partial or accumulated_len == 0:
+                                accumulated.append(part.text)
                                 logger.debug(f"Content Accumulated - Added {len(part.text)} chars")
                             
-                            new_accumulated_len = len(self._accumulated_content[session_id])
-                            
-                            # Check if this is from a sub-agent
-                            sub_agent_info = {}
-                            if hasattr(event, 'agent_name') and event.agent_name:
-                                sub_agent_info = {
-                                    "sub_agent_name": event.agent_name,
-                                    "is_sub_agent": True
+                            # Content metadata is only built for consumers that read it
+                            content_metadata = {}
+                            if with_metadata:
+                                content_metadata = {
+                                    "event_count": streaming_session.events_sent,
+                                    "chunk_size": len(part.text),
+                                    "chunk_id": f"{session_id}_chunk_{chunk_base + part_idx}",
+                                    "part_index": part_idx,
+                                    "accumulated_size": len(accumulated),
+                                    "is_streaming": True,
+                                    "is_partial": is_partial,
+                                    "is_final_response": is_final_response,
+                                    "adk_event_id": getattr(event, 'id', 'unknown')
                                 }
-                            elif hasattr(event, 'source') and event.source:
-                                sub_agent_info = {
-                                    "sub_agent_name": event.source,
-                                    "is_sub_agent": True
-                                }
-                            
-                            content_metadata = {
-                                "event_count": streaming_session.events_sent,
-                                "chunk_size": len(part.text),
-                                "chunk_id": chunk_id,
-                                "part_index": part_idx,
-                                "accumulated_size": new_accumulated_len,
-                                "is_streaming": True,
-                                "is_partial": is_partial,
-                                "is_final_response": is_final_response,
-                                "adk_event_id": getattr(event, 'id', 'unknown'),
-                                **sub_agent_info
-                            }
+                                # Check if this is from a sub-agent
+                                if sub_agent_name:
+                                    content_metadata["sub_agent_name"] = sub_agent_name
+                                    content_metadata["is_sub_agent"] = True
                             
-                            yield StreamingEvent(
-                                type=StreamingEventType.CONTENT,
-                                content=part.text,
-                                session_id=session_id,
-                                agent_id=agent_id,
-                                metadata=content_metadata
+                            yield _acquire_event(
+                                StreamingEventType.CONTENT,
+                                part.text,
+                                session_id,
+                                agent_id,
+                                content_metadata
                             )
                     
                     if has_content:
                         event_processed = True
             
-            # Send completion event
+            # Send completion event; one clock read feeds every time field
+            completed_ns = time.time_ns()
+            completed_at = completed_ns / 1e9
             completion_event = StreamingEvent(
                 type=StreamingEventType.COMPLETE,
                 content="",
@@ -412,9 +619,11 @@ class StreamingHandler:
                 agent_id=agent_id,
                 metadata={
                     "total_events": streaming_session.events_sent,
-                    "duration_seconds": time.time() - start_time,
-                    "completed_at": datetime.now().isoformat()
-                }
+                    "duration_seconds": completed_at - start_time,
+                    "completed_at": datetime.fromtimestamp(completed_at).isoformat(),
+                    "completed_at_ns": completed_ns
+                },
+                timestamp=completed_at
             )
             
             yield completion_event
@@ -431,16 +640,29 @@ class StreamingHandler:
             yield error_event
         
         finally:
+            if producer is not None:
+                producer.cancel()
+            
             # Cleanup session
             self._cleanup_session(session_id)
-            
-            # Clean up accumulated content tracking
-            if session_id in self._accumulated_content:
-                del self._accumulated_content[session_id]
-            
-            # Clean up debug counters
-            self._chunk_counters.pop(session_id, None)
-            self._event_counters.pop(session_id, None)
+
+    @staticmethod
+    def _tool_call_key(tool_call) -> Tuple[Any, Dict[str, Any]]:
+        """(name, args) identifying a tool call across the two dispatch paths"""
+        args = getattr(tool_call, 'args', None)
+        return getattr(tool_call, 'name', None), dict(args) if args else {}
+
+    async def _drain_events(self, events: AsyncGenerator, queue: asyncio.Queue):
+        """Forward events into the queue, ending with a sentinel"""
+        try:
+            async for event in events:
+                await queue.put(event)
+        except Exception as e:
+            # Re-raised by the consumer so its usual error handling applies
+            await queue.put(e)
+        finally:
+            await events.aclose()
+        await queue.put(_EVENTS_END)
 
     async def stream_to_sse(self,
                           session_id: str,
@@ -448,34 +670,77 @@ class StreamingHandler:
                           user_id: str,
                           agent,
                           message: str,
-                          adk_session=None) -> AsyncGenerator[str, None]:
+                          adk_session=None) -> AsyncGenerator[bytes, None]:
         """Stream responses in Server-Sent Events format"""
-        async for event in self.start_streaming_session(
-            session_id, agent_id, user_id, agent, message, adk_session
-        ):
-            # Format as SSE
-            sse_data = {
-                "type": event.type.value,
-                "content": event.content,
-                "metadata": event.metadata,
-                "timestamp": event.timestamp
-            }
+        # One pump task feeds a queue; content chunks already waiting in it are
+        # coalesced into one frame (up to flush_threshold_chars) and the buffer
+        # is flushed as soon as the queue runs dry, so no chunk is held back.
+        # Any other event flushes the buffer first to keep ordering
+        buffered: List[StreamingEvent] = []
+        buffered_chars = 0
+        
+        events: asyncio.Queue = asyncio.Queue(maxsize=_EVENT_QUEUE_SIZE)
+        pump = asyncio.create_task(self._drain_events(
+            self.start_streaming_session(
+                session_id, agent_id, user_id, agent, message, adk_session
+            ),
+            events
+        ))
+        try:
+            while True:
+                event = await events.get()
+                if event is _EVENTS_END:
+                    break
+                if isinstance(event, Exception):
+                    raise event
+                
+                if event.type is StreamingEventType.CONTENT:
+                    if buffered and event.metadata.get("sub_agent_name") != buffered[0].metadata.get("sub_agent_name"):
+                        yield self._flush_content(buffered)
+                    if not buffered:
+                        buffered_chars = 0
+                    buffered.append(event)
+                    buffered_chars += len(event.content)
+                    if (buffered_chars >= self.flush_threshold_chars or events.empty()
+                            or event.metadata.get("is_final_response")):
+                        yield self._flush_content(buffered)
+                    continue
+                
+                if buffered:
+                    yield self._flush_content(buffered)
+                yield _SSE_ENCODERS[event.type](event.content, event.metadata, event.timestamp)
+                # The frame is already encoded, so the event can be recycled
+                _release_event(event)
             
-            yield f"data: {json.dumps(sse_data)}\n\n"
+            if buffered:
+                yield self._flush_content(buffered)
+        finally:
+            pump.cancel()
+            await asyncio.gather(pump, return_exceptions=True)
         
         # Send final SSE close
-        yield "data: [DONE]\n\n"
+        yield _SSE_DONE
+
+    def _flush_content(self, buffered: List[StreamingEvent]) -> bytes:
+        """Merge buffered content events into one SSE frame and recycle them"""
+        merged = buffered[-1]
+        if len(buffered) > 1:
+            merged.content = "".join([event.content for event in buffered])
+            merged.metadata["chunk_size"] = len(merged.content)
+            merged.metadata["coalesced_chunks"] = len(buffered)
+            for event in buffered[:-1]:
+                _release_event(event)
+        frame = _SSE_ENCODERS[merged.type](merged.content, merged.metadata, merged.timestamp)
+        _release_event(merged)
+        buffered.clear()
+        return frame
 
     def _cleanup_session(self, session_id: str):
         """Cleanup streaming session resources"""
         try:
-            if session_id in self._active_sessions:
-                self._active_sessions[session_id].is_active = False
-            
-            # Clean up buffers
-            self._content_buffers.pop(session_id, None)
-            self._last_flush_time.pop(session_id, None)
-            
+            streaming_session = self._active_sessions.get(session_id)
+            if streaming_session is not None:
+                streaming_session.is_active = False
         except Exception as e:
             logger.error(f"Error cleaning up session {session_id}: {e}")
 